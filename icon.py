@@ -2,6 +2,6 @@ from PIL import Image
 
 src = Image.open("assets/logo.png")
 sizes = [(256,256), (128,128), (64,64), (48,48), (32,32), (16,16)]
-# optionally use LANCZOS for sharper resizing:
-icon_imgs = [src.resize(s, Image.LANCZOS) for s in sizes]
-icon_imgs[0].save("assets/icon.ico", sizes=sizes)
\ No newline at end of file
+# only the largest frame is resized here; Pillow derives the smaller sizes from it on save
+icon_img = src.resize(sizes[0], Image.LANCZOS)
+icon_img.save("assets/icon.ico", sizes=sizes)
\ No newline at end of file
@@ -1,19 +1,25 @@
 import sys
 import os
+import ctypes
+import hashlib
+import hmac
+import mmap
 import tempfile
-from PyQt5.QtCore import (
-    Qt, QUrl, QTime, QThread, pyqtSignal, pyqtSlot, QObject
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtCore import (
+    Qt, QUrl, QTime, QThreadPool, QRunnable, pyqtSignal, QObject, QIODevice
 )
-from PyQt5.QtGui import QIcon
-from PyQt5.QtWidgets import (
+from PyQt6.QtGui import QIcon
+from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QSlider, QLabel, QFileDialog, QStatusBar,
     QSizePolicy, QStyle, QInputDialog, QLineEdit
 )
-from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent
-from PyQt5.QtMultimediaWidgets import QVideoWidget
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from PyQt6.QtMultimedia import QMediaPlayer, QAudioOutput
+from PyQt6.QtMultimediaWidgets import QVideoWidget
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.backends import default_backend
 
@@ -26,141 +32,493 @@ def resource_path(relative_path: str) -> str:
     return os.path.join(base_path, relative_path)
 
 
-class DecryptorWorker(QObject):
+HEADER_SIZE = 1 + 256 + 1 + 16 + 16
+PBKDF2_ITERATIONS = 100000
+SCRYPT_N, SCRYPT_R, SCRYPT_P = 2 ** 14, 8, 1
+# The directory byte doubles as a flags field: bit 0 marks a directory, bit 1
+# selects scrypt instead of PBKDF2 so older files keep decrypting unchanged.
+FLAG_DIRECTORY = 0x01
+FLAG_SCRYPT = 0x02
+# Bit 2 means a 16-byte password check tag, HMAC-SHA256(key, nonce + ext)
+# truncated, follows the nonce.
+FLAG_TAG = 0x04
+TAG_SIZE = 16
+CHUNK_SIZE = 1 << 20
+PROGRESS_INTERVAL = 0.1
+CANCEL_CHECK_SIZE = 64 * 1024
+CANCEL_WAIT_MS = 2000
+DECRYPT_THREADS = os.cpu_count() or 1
+PARALLEL_MIN_RANGE = 16 * CHUNK_SIZE
+O_BINARY = getattr(os, 'O_BINARY', 0)
+HAS_MADVISE = hasattr(mmap.mmap, 'madvise') and hasattr(mmap, 'MADV_DONTNEED')
+AESNI_MIN_THROUGHPUT = 500 * (1 << 20)
+AESNI_PROBE_RUNS = 5
+
+
+def probe_aesni():
+    # Software AES in OpenSSL runs roughly 10x slower than AES-NI, so a quick
+    # 1 MiB CTR pass is enough to tell which implementation we are getting.
+    # Best of several runs into a reused buffer keeps page faults and
+    # scheduler noise from passing for software AES.
+    data = bytes(1 << 20)
+    out = bytearray(len(data) + 15)
+    cipher = Cipher(algorithms.AES(bytes(32)), modes.CTR(bytes(16)), backend=default_backend())
+    encryptor = cipher.encryptor()
+    encryptor.update_into(data, out)
+    best = float('inf')
+    for _ in range(AESNI_PROBE_RUNS):
+        start = time.perf_counter()
+        encryptor.update_into(data, out)
+        best = min(best, time.perf_counter() - start)
+    return best == 0 or len(data) / best >= AESNI_MIN_THROUGHPUT
+
+
+HAS_AESNI = probe_aesni()
+
+
+Header = namedtuple('Header', 'ext is_directory kdf salt nonce tag size')
+
+
+def read_header(fin):
+    ext_length = fin.read(1)[0]
+    ext_bytes = fin.read(256)[:ext_length]
+    flags = fin.read(1)[0]
+    salt = fin.read(16)
+    nonce = fin.read(16)
+    tag = fin.read(TAG_SIZE) if flags & FLAG_TAG else None
+    kdf = 'scrypt' if flags & FLAG_SCRYPT else 'pbkdf2'
+    size = HEADER_SIZE + (TAG_SIZE if tag is not None else 0)
+    return Header(ext_bytes.decode('utf-8'), bool(flags & FLAG_DIRECTORY), kdf, salt, nonce, tag, size)
+
+
+def check_password(key, header):
+    # Files without a tag can only be checked by decrypting them
+    if header.tag is None:
+        return True
+    expected = hmac.new(key, header.nonce + header.ext.encode('utf-8'), hashlib.sha256).digest()
+    return hmac.compare_digest(expected[:TAG_SIZE], header.tag)
+
+
+def write_all(fd, data):
+    # os.write() may write less than asked, unlike BufferedWriter.write()
+    while data:
+        data = data[os.write(fd, data):]
+
+
+def wipe(buf):
+    # Only mutable buffers can be zeroed; bytes copies live until collected
+    if buf:
+        ctypes.memset((ctypes.c_char * len(buf)).from_buffer(buf), 0, len(buf))
+
+
+_kdf_cache = {}
+KDF_CACHE_SIZE = 8
+
+
+def derive_key(password, header):
+    # Re-opening a file with the same password skips key derivation entirely.
+    # Keys are kept as bytearrays so clear_key_cache() can zero them.
+    # Returns None when the header's check tag rejects the password.
+    cache_key = (header.kdf, header.salt, hashlib.sha256(password.encode()).digest())
+    key = _kdf_cache.get(cache_key)
+    if key is None:
+        # Both hashlib KDFs run as a single OpenSSL call with the GIL released,
+        # so the UI and other pool threads keep running during derivation.
+        if header.kdf == 'scrypt':
+            key = bytearray(hashlib.scrypt(password.encode(), salt=header.salt, n=SCRYPT_N,
+                                           r=SCRYPT_R, p=SCRYPT_P, dklen=32))
+        else:
+            key = bytearray(hashlib.pbkdf2_hmac('sha256', password.encode(), header.salt,
+                                                PBKDF2_ITERATIONS, 32))
+        if not check_password(key, header):
+            wipe(key)
+            return None
+        # Untagged files can't reject a wrong password, so bound what piles up
+        while len(_kdf_cache) >= KDF_CACHE_SIZE:
+            wipe(_kdf_cache.pop(next(iter(_kdf_cache))))
+        _kdf_cache[cache_key] = key
+    return key
+
+
+def clear_key_cache():
+    for key in _kdf_cache.values():
+        wipe(key)
+    _kdf_cache.clear()
+
+
+class DecryptedStream(QIODevice):
+    """Random-access plaintext view of an encrypted file.
+
+    CTR mode lets any offset be decrypted on its own, so the media backend
+    can seek freely and playback starts without decrypting the whole file.
+    """
+
+    def __init__(self, input_path, key, nonce, header_size, parent=None):
+        super().__init__(parent)
+        self._file = open(input_path, 'rb')
+        self._key = bytearray(key)
+        self._nonce = int.from_bytes(nonce, 'big')
+        self._header_size = header_size
+        self._size = os.path.getsize(input_path) - header_size
+        self._pos = 0
+        self._decryptor = None
+        self._decryptor_pos = -1
+        self._closed = False
+        # readData() runs on the backend's demuxer thread, close() on the GUI thread
+        self._lock = threading.Lock()
+
+    def isSequential(self):
+        return False
+
+    def size(self):
+        return self._size
+
+    def seek(self, pos):
+        with self._lock:
+            if self._closed or pos < 0 or pos > self._size or not super().seek(pos):
+                return False
+            self._pos = pos
+            return True
+
+    def _reposition(self):
+        # The key is zeroed on close; a cipher built from it would decrypt garbage
+        if self._closed:
+            raise ValueError("stream is closed")
+        block, skip = divmod(self._pos, 16)
+        counter = ((self._nonce + block) % (1 << 128)).to_bytes(16, 'big')
+        cipher = Cipher(algorithms.AES(bytes(self._key)), modes.CTR(counter), backend=default_backend())
+        self._decryptor = cipher.decryptor()
+        self._decryptor.update(bytes(skip))
+        self._file.seek(self._header_size + self._pos)
+        self._decryptor_pos = self._pos
+
+    def readData(self, maxlen):
+        # Raising here would abort the app from inside Qt; None reports -1
+        with self._lock:
+            if self._closed:
+                return None
+            try:
+                if self._pos != self._decryptor_pos:
+                    self._reposition()
+                chunk = self._file.read(min(maxlen, CHUNK_SIZE))
+                data = self._decryptor.update(chunk)
+            except (OSError, ValueError):
+                return None
+            self._pos += len(data)
+            self._decryptor_pos = self._pos
+            return data
+
+    def writeData(self, data):
+        return -1
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._decryptor = None
+            super().close()
+            self._file.close()
+            wipe(self._key)
+
+
+class DecryptorSignals(QObject):
     finished = pyqtSignal(str)
+    stream_ready = pyqtSignal(str, bytes, bytes, int, int)
     error = pyqtSignal(str)
     progress = pyqtSignal(int)
 
-    def __init__(self, input_path, password, output_dir):
+
+class DecryptorWorker(QRunnable):
+    def __init__(self, input_path, password, output_dir, stream=True):
         super().__init__()
+        self.signals = DecryptorSignals()
         self.input_path = input_path
         self.password = password
         self.output_dir = output_dir
-        self._cancel_requested = False
+        self.stream = stream
+        self._cancel_event = threading.Event()
+        self._progress_lock = threading.Lock()
+        self.kdf_ms = 0
+
+    def run(self):
+        if self.stream:
+            self.prepare_stream()
+        else:
+            self.decrypt()
 
-    @pyqtSlot()
-    def decrypt(self):
+    def cancel(self):
+        self._cancel_event.set()
+
+    def _derive_key(self, header):
+        start = time.perf_counter()
+        key = derive_key(self.password, header)
+        self.password = None
+        self.kdf_ms = int((time.perf_counter() - start) * 1000)
+        return key
+
+    def prepare_stream(self):
         try:
-            HEADER_SIZE = 1 + 256 + 1 + 16 + 16
-            PBKDF2_ITERATIONS = 100000
-            CIPHER_MODE = modes.CTR
+            with open(self.input_path, 'rb') as fin:
+                header = read_header(fin)
+
+            if header.is_directory:
+                self.signals.error.emit("Cannot play encrypted directories.")
+                return
 
+            key = self._derive_key(header)
+            if key is None:
+                self.signals.error.emit("Incorrect password")
+                return
+
+            if not self._cancel_event.is_set():
+                self.signals.stream_ready.emit(self.input_path, bytes(key), header.nonce, header.size,
+                                               self.kdf_ms)
+        except Exception as e:
+            self.signals.error.emit(str(e))
+
+    def _report_progress(self, n):
+        with self._progress_lock:
+            self._processed += n
+            # Each emit is queued across threads to the UI; cap it at ~10/s
+            now = time.monotonic()
+            if now >= self._next_emit_at:
+                self.signals.progress.emit(self._processed * 100 // self._total_size)
+                self._next_emit_at = now + PROGRESS_INTERVAL
+
+    def _decrypt_range(self, key, nonce, header_size, output_file, start, length):
+        counter = (int.from_bytes(nonce, 'big') + start // 16) % (1 << 128)
+        cipher = Cipher(algorithms.AES(bytes(key)), modes.CTR(counter.to_bytes(16, 'big')),
+                        backend=default_backend())
+        decryptor = cipher.decryptor()
+
+        # update_into() needs room for one extra block minus a byte
+        buf_out = bytearray(CHUNK_SIZE + 15)
+        view_out = memoryview(buf_out)
+
+        out_fd = os.open(output_file, os.O_WRONLY | O_BINARY)
+        try:
+            with open(self.input_path, 'rb') as fin, \
+                    mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if HAS_MADVISE:
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                view_in = memoryview(mm)
+                try:
+                    os.lseek(out_fd, start, os.SEEK_SET)
+                    offset = header_size + start
+                    end = offset + length
+                    dropped = offset - offset % mmap.PAGESIZE
+                    while offset < end:
+                        n = min(end - offset, CHUNK_SIZE)
+                        m = 0
+                        # Parallel ranges all watch the same event, so check it
+                        # between sub-blocks rather than once per chunk.
+                        for sub in range(offset, offset + n, CANCEL_CHECK_SIZE):
+                            if self._cancel_event.is_set():
+                                return
+                            sub_end = min(sub + CANCEL_CHECK_SIZE, offset + n)
+                            m += decryptor.update_into(view_in[sub:sub_end], view_out[m:])
+                        write_all(out_fd, view_out[:m])
+                        offset += n
+                        self._report_progress(n)
+
+                        # Release pages already decrypted so multi-GB inputs
+                        # don't pile up in this process's mapping.
+                        consumed = offset - offset % mmap.PAGESIZE
+                        if HAS_MADVISE and consumed > dropped:
+                            mm.madvise(mmap.MADV_DONTNEED, dropped, consumed - dropped)
+                            dropped = consumed
+
+                    write_all(out_fd, decryptor.finalize())
+                finally:
+                    view_in.release()
+        finally:
+            os.close(out_fd)
+
+    def decrypt(self):
+        try:
             with open(self.input_path, 'rb') as fin:
-                ext_length = fin.read(1)[0]
-                ext_bytes = fin.read(256)[:ext_length]
-                is_directory = bool(fin.read(1)[0])
-                salt = fin.read(16)
-                nonce = fin.read(16)
-
-                original_ext = ext_bytes.decode('utf-8')
-                if is_directory:
-                    self.error.emit("Cannot play encrypted directories.")
-                    return
-
-                base_name = os.path.basename(self.input_path)
-                if base_name.lower().endswith('.enc'):
-                    base_name = base_name[:-4]
-
-                if not base_name.endswith(original_ext):
-                    clean_name = f"{base_name}{original_ext}"
-                else:
-                    clean_name = base_name
+                header = read_header(fin)
+            original_ext = header.ext
 
-                output_file = os.path.join(self.output_dir, clean_name)
+            if header.is_directory:
+                self.signals.error.emit("Cannot play encrypted directories.")
+                return
 
-                os.makedirs(os.path.dirname(output_file), exist_ok=True)
+            base_name = os.path.basename(self.input_path)
+            root, ext = os.path.splitext(base_name)
+            if ext.lower() == '.enc':
+                base_name = root
 
-                kdf = PBKDF2HMAC(
-                    algorithm=hashes.SHA256(),
-                    length=32,
-                    salt=salt,
-                    iterations=PBKDF2_ITERATIONS,
-                    backend=default_backend()
-                )
-                key = kdf.derive(self.password.encode())
+            if not base_name.endswith(original_ext):
+                clean_name = f"{base_name}{original_ext}"
+            else:
+                clean_name = base_name
 
-                cipher = Cipher(algorithms.AES(key), CIPHER_MODE(nonce), backend=default_backend())
-                decryptor = cipher.decryptor()
+            output_file = os.path.join(self.output_dir, clean_name)
 
-                total_size = os.path.getsize(self.input_path) - HEADER_SIZE
-                processed = 0
-                last_progress = -1
+            key = self._derive_key(header)
+            if key is None:
+                self.signals.error.emit("Incorrect password")
+                return
 
-                with open(output_file, 'wb') as fout:
-                    while not self._cancel_requested:
-                        chunk = fin.read(4096)
-                        if not chunk:
-                            break
+            # The KDF can't be interrupted; don't preallocate output for a dead job
+            if self._cancel_event.is_set():
+                return
 
-                        decrypted = decryptor.update(chunk)
-                        fout.write(decrypted)
-                        processed += len(chunk)
+            os.makedirs(os.path.dirname(output_file), exist_ok=True)
 
-                        current_progress = int((processed / total_size) * 100)
-                        if current_progress != last_progress:
-                            self.progress.emit(current_progress)
-                            last_progress = current_progress
+            total_size = os.path.getsize(self.input_path) - header.size
+            self._total_size = total_size
+            self._processed = 0
+            self._next_emit_at = time.monotonic() + PROGRESS_INTERVAL
 
-                    if not self._cancel_requested:
-                        fout.write(decryptor.finalize())
+            out_fd = os.open(output_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | O_BINARY, 0o600)
+            try:
+                if total_size and hasattr(os, 'posix_fallocate'):
+                    os.posix_fallocate(out_fd, 0, total_size)
+                else:
+                    os.ftruncate(out_fd, total_size)
+            finally:
+                os.close(out_fd)
+
+            # Split on 16-byte block boundaries so every range starts on its
+            # own CTR counter value and can be decrypted independently.
+            nblocks = total_size // 16
+            # With AES-NI a single core already outpaces the disk; spreading
+            # the work only pays off when OpenSSL falls back to software AES.
+            if HAS_AESNI:
+                threads = 1
+            else:
+                threads = max(1, min(DECRYPT_THREADS, total_size // PARALLEL_MIN_RANGE))
+            bounds = [t * nblocks // threads * 16 for t in range(threads)] + [total_size]
+            ranges = [(start, end - start) for start, end in zip(bounds, bounds[1:])]
 
-                self.finished.emit(output_file)
+            if threads == 1:
+                self._decrypt_range(key, header.nonce, header.size, output_file, *ranges[0])
+            else:
+                with ThreadPoolExecutor(max_workers=threads) as pool:
+                    futures = [pool.submit(self._decrypt_range, key, header.nonce, header.size,
+                                           output_file, start, length)
+                               for start, length in ranges]
+                    for future in futures:
+                        future.result()
+
+            if not self._cancel_event.is_set():
+                self.signals.finished.emit(output_file)
         except Exception as e:
-            self.error.emit(str(e))
+            self.signals.error.emit(str(e))
 
 
 class MediaPlayer(QMainWindow):
+    _WINDOW_QSS = """
+        QWidget { background-color: #1a1a1a; color: white; }
+        QLabel { font: 10pt; }
+    """
+
+    _SLIDER_QSS = """
+        QSlider::groove:horizontal {
+            background: #404040;
+            height: 5px;
+            border-radius: 2px;
+        }
+        QSlider::handle:horizontal {
+            background: #fff;
+            width: 14px;
+            margin: -6px 0;
+            border-radius: 7px;
+        }
+        QSlider::sub-page:horizontal {
+            background: #2196F3;
+        }
+    """
+
+    _BUTTON_QSS = """
+        QPushButton {
+            background: #333;
+            border: none;
+            padding: 8px;
+            border-radius: 4px;
+            min-width: 36px;
+        }
+        QPushButton:hover { background: #444; }
+        QPushButton:pressed { background: #2a2a2a; }
+        QPushButton:disabled { background: #2a2a2a; color: #666; }
+    """
+
+    # Applied once to the QApplication so Qt parses it a single time
+    _GLOBAL_QSS = _WINDOW_QSS + _SLIDER_QSS + _BUTTON_QSS
+
+    _ICON_CACHE = {}
+
+    _MEDIA_FILTER = "Media Files (*.mp4 *.avi *.mkv *.mov *.mp3 *.wav *.enc)"
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Secure Media Player")
         icon_file = resource_path('assets/logo.png')
         self.setWindowIcon(QIcon(icon_file))
         self.setMinimumSize(800, 500)
-        self.setStyleSheet("background-color: #1a1a1a; color: white;")
 
         self.media_player = QMediaPlayer()
+        self.audio_output = QAudioOutput()
+        self.media_player.setAudioOutput(self.audio_output)
         self.video_widget = QVideoWidget()
         self.setup_media_player()
 
         self.temp_dir = tempfile.TemporaryDirectory()
         self.temp_files = []
+        self.stream = None
+        self.stream_source = None
+        self.pool = QThreadPool.globalInstance()
+        self.decrypt_worker = None
 
         self.create_controls()
         self.setup_layout()
         self.setup_connections()
 
         self.normal_window_geometry = None
+        if not HAS_AESNI:
+            self.status_bar.showMessage("Hardware AES not detected - decryption will be slower")
+        self._last_sec = -1
+        self._last_slider_px = -1
+        self._duration = 0
 
     def setup_media_player(self):
         self.media_player.setVideoOutput(self.video_widget)
         self.video_widget.setStyleSheet("background: black;")
-        self.video_widget.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-        self.video_widget.setAspectRatioMode(Qt.KeepAspectRatio)
-        self.media_player.error.connect(self.show_error)
+        self.video_widget.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        self.video_widget.setAspectRatioMode(Qt.AspectRatioMode.KeepAspectRatio)
+        self.media_player.errorOccurred.connect(self.show_error)
         self.media_player.mediaStatusChanged.connect(self.handle_media_status)
 
     def handle_media_status(self, status):
-        if status == QMediaPlayer.LoadedMedia:
+        if status == QMediaPlayer.MediaStatus.LoadedMedia:
+            # Streaming works, so the password is no longer needed for a fallback
+            self.stream_source = None
             self.status_bar.showMessage("Media loaded - ready to play")
             self.btn_play.setEnabled(True)
             self.media_player.play()
-        elif status == QMediaPlayer.InvalidMedia:
+        elif status == QMediaPlayer.MediaStatus.InvalidMedia:
+            if self.stream_source:
+                # Backend cannot play from a QIODevice; decrypt to disk instead
+                file_path, password = self.stream_source
+                self.stream_source = None
+                self.start_decryption(file_path, password, stream=False)
+                return
             self.status_bar.showMessage("Error: Unsupported media format")
-        elif status == QMediaPlayer.NoMedia:
+        elif status == QMediaPlayer.MediaStatus.NoMedia:
             self.status_bar.showMessage("No media loaded")
 
     def create_controls(self):
-        style = self.style()
-
-        self.btn_open = self.create_button("Open File", QStyle.SP_DialogOpenButton)
-        self.btn_play = self.create_button("Play", QStyle.SP_MediaPlay)
-        self.btn_pause = self.create_button("Pause", QStyle.SP_MediaPause)
-        self.btn_stop = self.create_button("Stop", QStyle.SP_MediaStop)
-        self.btn_fullscreen = self.create_button("Fullscreen", QStyle.SP_TitleBarMaxButton)
-        self.btn_mute = self.create_button("Mute", QStyle.SP_MediaVolume, checkable=True)
-
-        self.seek_slider = QSlider(Qt.Horizontal)
-        self.volume_slider = QSlider(Qt.Horizontal)
+        self.btn_open = self.create_button("Open File", QStyle.StandardPixmap.SP_DialogOpenButton)
+        self.btn_play = self.create_button("Play", QStyle.StandardPixmap.SP_MediaPlay)
+        self.btn_pause = self.create_button("Pause", QStyle.StandardPixmap.SP_MediaPause)
+        self.btn_stop = self.create_button("Stop", QStyle.StandardPixmap.SP_MediaStop)
+        self.btn_fullscreen = self.create_button("Fullscreen", QStyle.StandardPixmap.SP_TitleBarMaxButton)
+        self.btn_mute = self.create_button("Mute", QStyle.StandardPixmap.SP_MediaVolume, checkable=True)
+
+        self.seek_slider = QSlider(Qt.Orientation.Horizontal)
+        self.seek_slider.setTracking(False)
+        self.volume_slider = QSlider(Qt.Orientation.Horizontal)
         self.volume_slider.setRange(0, 100)
         self.volume_slider.setValue(100)
         self.lbl_current = QLabel("00:00:00")
@@ -169,55 +527,19 @@ class MediaPlayer(QMainWindow):
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
 
-        self.style_controls()
+    def standard_icon(self, icon_style):
+        icon = MediaPlayer._ICON_CACHE.get(icon_style)
+        if icon is None:
+            icon = MediaPlayer._ICON_CACHE[icon_style] = self.style().standardIcon(icon_style)
+        return icon
 
     def create_button(self, tooltip, icon_style, checkable=False):
         btn = QPushButton()
-        btn.setIcon(self.style().standardIcon(icon_style))
+        btn.setIcon(self.standard_icon(icon_style))
         btn.setToolTip(tooltip)
         btn.setCheckable(checkable)
         return btn
 
-    def style_controls(self):
-        slider_style = """
-            QSlider::groove:horizontal {
-                background: #404040;
-                height: 5px;
-                border-radius: 2px;
-            }
-            QSlider::handle:horizontal {
-                background: #fff;
-                width: 14px;
-                margin: -6px 0;
-                border-radius: 7px;
-            }
-            QSlider::sub-page:horizontal {
-                background: #2196F3;
-            }
-        """
-
-        button_style = """
-            QPushButton {
-                background: #333;
-                border: none;
-                padding: 8px;
-                border-radius: 4px;
-                min-width: 36px;
-            }
-            QPushButton:hover { background: #444; }
-            QPushButton:pressed { background: #2a2a2a; }
-            QPushButton:disabled { background: #2a2a2a; color: #666; }
-        """
-
-        for btn in [self.btn_open, self.btn_play, self.btn_pause,
-                    self.btn_stop, self.btn_fullscreen, self.btn_mute]:
-            btn.setStyleSheet(button_style)
-
-        self.seek_slider.setStyleSheet(slider_style)
-        self.volume_slider.setStyleSheet(slider_style)
-        self.lbl_current.setStyleSheet("font: 10pt;")
-        self.lbl_duration.setStyleSheet("font: 10pt;")
-
     def setup_layout(self):
         time_layout = QHBoxLayout()
         time_layout.addWidget(self.lbl_current)
@@ -252,23 +574,23 @@ class MediaPlayer(QMainWindow):
         self.btn_fullscreen.clicked.connect(self.toggle_fullscreen)
         self.btn_mute.clicked.connect(self.toggle_mute)
 
-        self.volume_slider.valueChanged.connect(self.media_player.setVolume)
-        self.seek_slider.sliderMoved.connect(self.media_player.setPosition)
+        self.volume_slider.valueChanged.connect(self.set_volume)
+        self.seek_slider.sliderReleased.connect(self.seek)
 
         self.media_player.positionChanged.connect(self.update_position)
         self.media_player.durationChanged.connect(self.update_duration)
-        self.media_player.stateChanged.connect(self.update_buttons)
+        self.media_player.playbackStateChanged.connect(self.update_buttons)
 
     def open_file(self):
         file, _ = QFileDialog.getOpenFileName(
-            self, "Open Media File", "",
-            "Media Files (*.mp4 *.avi *.mkv *.mov *.mp3 *.wav *.enc)")
+            self, "Open Media File", "", self._MEDIA_FILTER)
 
         if file:
+            self.cancel_decryption()
             if file.endswith('.enc'):
                 password, ok = QInputDialog.getText(
                     self, 'Password Required', 'Enter decryption password:',
-                    QLineEdit.Password)
+                    QLineEdit.EchoMode.Password)
                 if ok and password:
                     self.start_decryption(file, password)
                 else:
@@ -277,24 +599,53 @@ class MediaPlayer(QMainWindow):
                 self.load_media_file(file)
 
     def load_media_file(self, file_path):
-        self.media_player.setMedia(QMediaContent(QUrl.fromLocalFile(file_path)))
+        self.stream_source = None
+        self.media_player.setSource(QUrl.fromLocalFile(file_path))
+        self.close_stream()
         self.btn_play.setEnabled(True)
         self.status_bar.showMessage(f"Loaded: {os.path.basename(file_path)}")
 
-    def start_decryption(self, file_path, password):
-        self.decrypt_worker = DecryptorWorker(file_path, password, self.temp_dir.name)
-        self.thread = QThread()
-        self.decrypt_worker.moveToThread(self.thread)
-        self.thread.started.connect(self.decrypt_worker.decrypt)
-        self.decrypt_worker.finished.connect(self.handle_decrypted_file)
-        self.decrypt_worker.error.connect(self.show_decryption_error)
-        self.decrypt_worker.progress.connect(self.update_decryption_progress)
-        self.decrypt_worker.finished.connect(self.thread.quit)
-        self.thread.finished.connect(self.thread.deleteLater)
+    def load_stream(self, file_path, key, nonce, header_size, kdf_ms):
+        if not self.is_current_worker():
+            return
+        previous = self.stream
+        self.stream = DecryptedStream(file_path, key, nonce, header_size)
+        self.stream.open(QIODevice.OpenModeFlag.ReadOnly | QIODevice.OpenModeFlag.Unbuffered)
+        self.media_player.setSourceDevice(self.stream)
+        if previous:
+            previous.close()
+        self.btn_play.setEnabled(True)
+        self.status_bar.showMessage(
+            f"Streaming: {os.path.basename(file_path)} (key derived in {kdf_ms} ms)")
+
+    def close_stream(self):
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+
+    def cancel_decryption(self):
+        if self.decrypt_worker:
+            self.decrypt_worker.cancel()
+            self.decrypt_worker = None
+
+    def is_current_worker(self):
+        # Signals queued by a cancelled job may still arrive after it was replaced
+        return self.decrypt_worker is not None and self.sender() is self.decrypt_worker.signals
+
+    def start_decryption(self, file_path, password, stream=True):
+        self.cancel_decryption()
+        self.stream_source = (file_path, password) if stream else None
+        self.decrypt_worker = DecryptorWorker(file_path, password, self.temp_dir.name, stream)
+        self.decrypt_worker.signals.finished.connect(self.handle_decrypted_file)
+        self.decrypt_worker.signals.stream_ready.connect(self.load_stream)
+        self.decrypt_worker.signals.error.connect(self.show_decryption_error)
+        self.decrypt_worker.signals.progress.connect(self.update_decryption_progress)
         self.status_bar.showMessage("Decrypting...")
-        self.thread.start()
+        self.pool.start(self.decrypt_worker)
 
     def handle_decrypted_file(self, output_file):
+        if not self.is_current_worker():
+            return
         if not os.path.exists(output_file):
             self.status_bar.showMessage("Decryption failed: No output file created")
             return
@@ -308,36 +659,64 @@ class MediaPlayer(QMainWindow):
         self.load_media_file(output_file)
 
     def show_decryption_error(self, error_msg):
+        if not self.is_current_worker():
+            return
+        self.stream_source = None
         self.status_bar.showMessage(f"Decryption error: {error_msg}")
 
     def update_decryption_progress(self, progress):
+        if not self.is_current_worker():
+            return
         self.status_bar.showMessage(f"Decrypting... {progress}%")
 
+    def seek(self):
+        # sliderReleased fires before value() catches up with the handle
+        self.media_player.setPosition(self.seek_slider.sliderPosition())
+
     def update_position(self, position):
-        self.seek_slider.setValue(position)
-        self.lbl_current.setText(QTime(0, 0, 0).addMSecs(position).toString("HH:mm:ss"))
+        # Skip repaints until the handle would actually move a pixel
+        px = position * self.seek_slider.width() // max(1, self._duration)
+        if px != self._last_slider_px and not self.seek_slider.isSliderDown():
+            self._last_slider_px = px
+            self.seek_slider.setValue(position)
+
+        sec = position // 1000
+        if sec == self._last_sec:
+            return
+        self._last_sec = sec
+        h, rem = divmod(sec, 3600)
+        m, s = divmod(rem, 60)
+        self.lbl_current.setText(f"{h:02d}:{m:02d}:{s:02d}")
 
     def update_duration(self, duration):
+        self._duration = duration
+        self._last_slider_px = -1
         self.seek_slider.setRange(0, duration)
         self.lbl_duration.setText(QTime(0, 0, 0).addMSecs(duration).toString("HH:mm:ss"))
 
     def update_buttons(self, state):
-        self.btn_play.setEnabled(state != QMediaPlayer.PlayingState)
-        self.btn_pause.setEnabled(state == QMediaPlayer.PlayingState)
-        self.btn_stop.setEnabled(state != QMediaPlayer.StoppedState)
+        self.btn_play.setEnabled(state != QMediaPlayer.PlaybackState.PlayingState)
+        self.btn_pause.setEnabled(state == QMediaPlayer.PlaybackState.PlayingState)
+        self.btn_stop.setEnabled(state != QMediaPlayer.PlaybackState.StoppedState)
 
     def stop(self):
         self.media_player.stop()
         self.seek_slider.setValue(0)
         self.lbl_current.setText("00:00:00")
+        self._last_sec = 0
+        self._last_slider_px = -1
+
+    def set_volume(self, value):
+        # QAudioOutput takes a linear 0.0-1.0 volume
+        self.audio_output.setVolume(value / 100)
 
     def toggle_mute(self, checked):
         if checked:
-            self.media_player.setVolume(0)
-            self.btn_mute.setIcon(self.style().standardIcon(QStyle.SP_MediaVolumeMuted))
+            self.audio_output.setVolume(0)
+            self.btn_mute.setIcon(self.standard_icon(QStyle.StandardPixmap.SP_MediaVolumeMuted))
         else:
-            self.media_player.setVolume(self.volume_slider.value())
-            self.btn_mute.setIcon(self.style().standardIcon(QStyle.SP_MediaVolume))
+            self.set_volume(self.volume_slider.value())
+            self.btn_mute.setIcon(self.standard_icon(QStyle.StandardPixmap.SP_MediaVolume))
 
     def toggle_fullscreen(self):
         if self.isFullScreen():
@@ -352,6 +731,13 @@ class MediaPlayer(QMainWindow):
         self.status_bar.showMessage(f"Player error: {self.media_player.errorString()}")
 
     def closeEvent(self, event):
+        self.media_player.stop()
+        self.close_stream()
+        # Let running ranges release their files before the temp dir goes;
+        # jobs cancelled earlier by open_file() may still be winding down.
+        self.cancel_decryption()
+        self.pool.waitForDone(CANCEL_WAIT_MS)
+        clear_key_cache()
         for file in self.temp_files:
             try:
                 if os.path.exists(file):
@@ -364,6 +750,7 @@ class MediaPlayer(QMainWindow):
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
+    app.setStyleSheet(MediaPlayer._GLOBAL_QSS)
     player = MediaPlayer()
     player.showMaximized()
-    sys.exit(app.exec_())
\ No newline at end of file
+    sys.exit(app.exec())
\ No newline at end of file